@@ -10,6 +10,104 @@ bottom of this module.
 import random
 import time
 import json
+import marshal
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Use orjson for the highscore file if it is installed.
+try:
+    from orjson import dumps as _dump_json, loads as _load_json
+except ImportError:
+    def _dump_json(obj):
+        """Serialize obj to JSON, and return it as UTF-8 encoded bytes."""
+        return json.dumps(obj).encode("utf-8")
+
+    _load_json = json.loads
+
+# Messages shown when a word has been solved.
+PRAISES = ("Well done!", "Great!", "Awesome!")
+
+# Parsed word files by file name, so that each one is read only once.
+_WORD_CACHE = {}
+
+# Format version of the word cache files. Raise it when the format changes.
+_WORD_CACHE_FORMAT = 3
+
+
+def _load_word_lists(file_name):
+    """Read a word file and return a list of word lists, one per line.
+
+    The file is read and upper-cased in one go before it is split. The
+    result is also saved with marshal to a cache file next to the word
+    file (e.g. 'words_en.cache'), together with the modification time
+    and size of the word file. As long as both still match, the cache
+    file is loaded instead. Return None if the word file is missing.
+    """
+    cache_file = os.path.splitext(file_name)[0] + ".cache"
+    try:
+        word_stat = os.stat(file_name)
+    except FileNotFoundError:
+        return None
+    word_stamp = (word_stat.st_mtime_ns, word_stat.st_size)
+
+    try:
+        with open(cache_file, "rb") as cache:
+            cache_format, cache_stamp, word_lists = marshal.load(cache)
+        if cache_format == _WORD_CACHE_FORMAT and cache_stamp == word_stamp:
+            return word_lists
+    except (OSError, EOFError, ValueError, TypeError):
+        # A missing or broken cache file is simply created again.
+        pass
+
+    with open(file_name, "rb") as word_file:
+        lines = word_file.read().decode("utf-8").upper().splitlines()
+    word_lists = [line.split(",") for line in lines]
+
+    try:
+        with open(cache_file, "wb") as cache:
+            marshal.dump((_WORD_CACHE_FORMAT, word_stamp, word_lists), cache)
+    except OSError:
+        pass
+    return word_lists
+
+
+def _sattolo(letters, start=0):
+    """Shuffle letters from index start on in place to a cyclic permutation.
+
+    This is Sattolo's variant of the Fisher-Yates shuffle. It picks each
+    swap partner below i instead of up to i, so no letter stays in place.
+    Only cyclic permutations are created, each with the same chance, so
+    not every order of the letters is possible.
+
+    All random numbers for the shuffle are drawn with a single call to
+    getrandbits(), 32 bits per swap. Each 32-bit value is mapped to an
+    index below i with a multiplication and a shift (Lemire's method)
+    instead of a division.
+    """
+    swaps = len(letters) - 1 - start
+    if swaps < 1:
+        return
+    bits = random.getrandbits(32 * swaps)
+    for i in range(len(letters) - 1, start, -1):
+        j = start + (((bits & 0xFFFFFFFF) * (i - start)) >> 32)
+        bits >>= 32
+        letters[i], letters[j] = letters[j], letters[i]
+
+
+def _scramble_word(word, start=0):
+    """Return word with its letters from index start on scrambled.
+
+    ASCII words are shuffled as a bytearray, which doesn't need a string
+    object per letter. Words with other letters are shuffled as a list.
+    """
+    try:
+        letters = bytearray(word, "ascii")
+    except UnicodeEncodeError:
+        letters = list(word)
+        _sattolo(letters, start)
+        return "".join(letters)
+    _sattolo(letters, start)
+    return letters.decode("ascii")
 
 
 class ScrambledWords():
@@ -23,50 +121,96 @@ class ScrambledWords():
     def __init__(self):
         """Initialize class variables.
 
-        Call methods get_words() and scramble() for the first time to
-        create a list of scrambled words. The number of levels depends
-        on the number of lines in the word file.
+        Nothing is read yet. Words are read on first use, or in the
+        background while play() shows the instructions. The number of
+        levels depends on the number of lines in the word file. Words
+        are only scrambled when their level is played.
         """
-        self.words = self.get_words()
-        if self.words:
-            self.scrambled_words = self.scramble()
-            self.total_levels = len(self.words)
         self.current_level = 0
         self.level_times = []
         self.hint = True
         self.continue_game = True
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._wordbank = None
+        self._scrambled_cache = {}
+        self._highscores = None
 
     def __repr__(self):
         """Provide information on this class."""
         return "Scrambled Words is a text-based word guessing game."
 
+    @property
+    def words(self):
+        """List of words, one for each level, or None without word file."""
+        self._load_words()
+        return self._wordbank.result()
+
+    @property
+    def scrambled_words(self):
+        """List of scrambled words, one for each level."""
+        return [self._get_scrambled_word(level)
+                for level in range(1, self.total_levels + 1)]
+
+    @property
+    def total_levels(self):
+        """Number of levels in a game."""
+        return len(self.words)
+
+    def _load_words(self):
+        """Start reading words in the background, unless already started."""
+        if self._wordbank is None:
+            self._wordbank = self._executor.submit(self.get_words)
+
     @staticmethod
     def get_words():
         """Read words from file and return a list of random words.
 
-        The list contains one word for each level.
+        The list contains one word for each level. The parsed file is
+        cached, so a new game doesn't read it again.
         """
-        try:
-            with open(WORD_FILE, "r", encoding="utf-8") as word_file:
-                word_lists = [line.strip().split(",") for line in word_file]
-        except FileNotFoundError:
-            return None
-        else:
-            words = [random.choice(w_list).upper() for w_list in word_lists]
-            return words
+        word_lists = _WORD_CACHE.get(WORD_FILE)
+        if word_lists is None:
+            word_lists = _load_word_lists(WORD_FILE)
+            if word_lists is None:
+                return None
+            _WORD_CACHE[WORD_FILE] = word_lists
+        if not word_lists:
+            return []
+
+        # Draw the random bits for 64 lines at a time, 32 bits per line,
+        # and map them to an index like in _sattolo(). A fixed chunk size
+        # keeps the shifts cheap for large word files.
+        words = []
+        for line_number, w_list in enumerate(word_lists):
+            if not line_number % 64:
+                bits = random.getrandbits(32 * 64)
+            index = ((bits & 0xFFFFFFFF) * len(w_list)) >> 32
+            bits >>= 32
+            words.append(w_list[index])
+        return words
 
     def scramble(self):
-        """Scramble words in list, and return list."""
-        scrambled_words = []
-        for word in self.words:
-            scrambled_word = word
-            # Make sure that the letter order is shuffled.
-            while scrambled_word == word:
-                letters = list(scrambled_word)
-                random.shuffle(letters)
-                scrambled_word = "".join(letters)
-            scrambled_words.append(scrambled_word)
-        return scrambled_words
+        """Scramble words in list, and return list.
+
+        Return the same scrambled words that the levels show (see
+        scrambled_words). Letters are shuffled with Sattolo's variant of
+        the Fisher-Yates algorithm, so a scrambled word differs from the
+        original one unless all of its letters are the same.
+        """
+        return self.scrambled_words
+
+    def _get_scrambled_word(self, level):
+        """Return the scrambled word of a level.
+
+        The word is scrambled the first time it is needed, and kept
+        per level until the next game. A word that appears in two
+        levels is scrambled separately for each of them.
+        """
+        scrambled_word = self._scrambled_cache.get(level)
+        if scrambled_word is None:
+            scrambled_word = _scramble_word(self.words[level - 1])
+            self._scrambled_cache[level] = scrambled_word
+        return scrambled_word
 
     def next_level(self):
         """Raise level counter and start countdown to next level."""
@@ -80,14 +224,15 @@ class ScrambledWords():
         End level if the word has been solved or if guess limit has
         been reached. The hint option is not available if the word has
         less than five letters, because create_hint() corrects the
-        first three letters.
+        first three letters. It is not used up either if the hint would
+        show the solution.
         """
-        scrambled_word = self.scrambled_words[self.current_level - 1]
+        scrambled_word = self._get_scrambled_word(self.current_level)
         word = self.words[self.current_level - 1]
         guesses = MAX_GUESSES
 
         # Save start time.
-        start = time.time()
+        start = time.perf_counter()
 
         print(f"\n== Level {self.current_level} of {self.total_levels} "
               f"({self.current_level * 10} points) ==")
@@ -102,9 +247,14 @@ class ScrambledWords():
             if user_input == "H":
                 if self.hint:
                     if len(word) > 4:
-                        scrambled_word = self.create_hint(word)
-                        self.hint = False
-                        print("You requested a hint. Here it comes:")
+                        hint = self.create_hint(word)
+                        if hint != word:
+                            scrambled_word = hint
+                            self.hint = False
+                            print("You requested a hint. Here it comes:")
+                        else:
+                            print("There is no hint for this word.")
+                            print("Try to unscramble it on your own.")
                     else:
                         print("This word is too short to use the hint option.")
                         print("Try to unscramble it on your own.")
@@ -119,11 +269,11 @@ class ScrambledWords():
 
         if user_input == word:
             # Save finish and level time.
-            finish = time.time()
-            self.level_times.append(round((finish - start), 1))
+            finish = time.perf_counter()
+            self.level_times.append(finish - start)
 
-            print(random.choice(("Well done!", "Great!", "Awesome!")), end=" ")
-            print(f"You finished this level in {self.level_times[-1]} "
+            print(random.choice(PRAISES), end=" ")
+            print(f"You finished this level in {self.level_times[-1]:.1f} "
                   "seconds.")
         else:
             self.level_times.append(0)
@@ -134,15 +284,12 @@ class ScrambledWords():
         """Create and return new string as a hint.
 
         Take the correct word as argument. Keep the first three letters,
-        and shuffle the rest.
+        and shuffle the rest. _scramble_word() moves every one of these
+        letters, so the hint differs from the word unless the rest
+        consists of a single letter or of one letter repeated. Then the
+        word itself is returned, and challenge() doesn't show it.
         """
-        letters = list(word)
-        part1 = letters[:3]
-        part2 = letters[3:]
-        # Make sure that the letter order is shuffled.
-        while part2 == letters[3:]:
-            random.shuffle(part2)
-        return "".join(part1) + "".join(part2)
+        return _scramble_word(word, 3)
 
     def get_results(self):
         """Calculate regular and bonus points per level, and the total score.
@@ -151,41 +298,28 @@ class ScrambledWords():
         solved word is worth 10 times its level number. Double that
         amount if the level time doesn't exceed the time limit.
         """
-        level_points = []
-        level_bonus = []
-        score = 0
-
-        for i in range(self.total_levels):
-            if self.level_times[i]:
-                level_points.append((i + 1) * 10)
-
-                if self.level_times[i] <= TIME_LIMIT:
-                    level_bonus.append((i + 1) * 10)
-                else:
-                    level_bonus.append(0)
-
-            else:
-                level_points.append(0)
-                level_bonus.append(0)
-
-        for amount in level_points:
-            score += amount
-        for amount in level_bonus:
-            score += amount
+        level_values = range(10, (len(self.level_times) + 1) * 10, 10)
+        level_points = [value if level_time else 0 for value, level_time
+                        in zip(level_values, self.level_times)]
+        # Unsolved levels already have 0 points, so no bonus either.
+        # Compare the time as it is shown, rounded to tenths of a second.
+        level_bonus = [points if round(level_time, 1) <= TIME_LIMIT else 0
+                       for points, level_time
+                       in zip(level_points, self.level_times)]
+        score = sum(level_points) + sum(level_bonus)
         return level_points, level_bonus, score
 
     def show_results(self, level_points, level_bonus, score):
         """Show the player's results."""
         time.sleep(3)
-        print("\n== Results: ==")
-        print("\nLvl\tPts\tBonus\tTime (sec)")
+        lines = ["\n== Results: ==", "\nLvl\tPts\tBonus\tTime (sec)"]
         for i in range(self.total_levels):
-            print(f"{i + 1}\t{level_points[i]}\t{level_bonus[i]}\t", end="")
-            if self.level_times[i] > 0:
-                print(self.level_times[i])
-            else:
-                print("-")
-        print(f"\nYour total score: {score}")
+            level_time = self.level_times[i]
+            shown_time = f"{level_time:.1f}" if level_time > 0 else "-"
+            lines.append(f"{i + 1}\t{level_points[i]}\t{level_bonus[i]}\t"
+                         f"{shown_time}")
+        lines.append(f"\nYour total score: {score}")
+        print(*lines, sep="\n")
 
     @staticmethod
     def get_highscores():
@@ -197,28 +331,26 @@ class ScrambledWords():
         at a time. A new highscore must at least be as high as the
         lowest (= last) entry in the list.
         """
-        try:
-            with open("highscores.json", "r", encoding="utf-8") as hscore_file:
-                scorelist = json.load(hscore_file)
-
-                # Convert score numbers from string to integer,
-                # so they can be compared and sorted.
-                converted_scorelist = []
-                for entry in scorelist:
-                    points, player = entry
-                    converted_scorelist.append([int(points), player])
-                scorelist = converted_scorelist
-        except FileNotFoundError:
-            scorelist = []
-        return scorelist
+        # There is no highscore file until the first highscore has been
+        # achieved, so check for it instead of raising an exception.
+        if not os.path.exists("highscores.json"):
+            return []
+        with open("highscores.json", "rb") as hscore_file:
+            highscores = _load_json(hscore_file.read())
+
+        if isinstance(highscores, dict):
+            return highscores["scores"]
+        # Older highscore files contain a plain list of entries with the
+        # score numbers stored as strings.
+        return [[int(points), player] for points, player in highscores]
 
     @staticmethod
     def add_highscore(score, scorelist):
         """Add a new highscore, write list to file, and return list.
 
         If the list already contains ten or more highscore entries,
-        remove the last entries before adding the new one. Sort the
-        list before writing and returning it.
+        remove the last entries before adding the new one. The list is
+        kept sorted by inserting the new entry at its rank.
         """
         print("\n** NEW HIGHSCORE **")
         print("Please enter your name:")
@@ -227,22 +359,18 @@ class ScrambledWords():
             player = input("> ")
         print(f"\nCongratulations, {player}!")
 
-        while len(scorelist) >= 10:
-            scorelist.pop()
-
-        scorelist.append([score, player])
-        scorelist = sorted(scorelist, reverse=True)
+        del scorelist[9:]
 
-        # Convert score numbers from integer to string,
-        # so they can be written to file.
-        converted_scorelist = []
-        for entry in scorelist:
-            points, player = entry
-            converted_scorelist.append([str(points), player])
-        scorelist = converted_scorelist
+        new_entry = [score, player]
+        rank = 0
+        while rank < len(scorelist) and scorelist[rank] > new_entry:
+            rank += 1
+        scorelist.insert(rank, new_entry)
 
-        with open("highscores.json", "w", encoding="utf-8") as hscore_file:
-            json.dump(scorelist, hscore_file)
+        # Score numbers are stored as JSON integers. The version key
+        # tells this format apart from older files.
+        with open("highscores.json", "wb") as hscore_file:
+            hscore_file.write(_dump_json({"v": 2, "scores": scorelist}))
         if len(scorelist) == 1:
             print("Highscore file created.")
         else:
@@ -253,29 +381,30 @@ class ScrambledWords():
     def show_highscores(scorelist):
         """Show highscores."""
         time.sleep(3)
-        print("\n== Highscores: ==\n")
+        lines = ["\n== Highscores: ==\n"]
         if scorelist:
-            for rank, entry in enumerate(scorelist, 1):
-                print(f"{rank}.\t{entry[0]}\t{entry[1]}")
+            lines.extend(f"{rank}.\t{entry[0]}\t{entry[1]}"
+                         for rank, entry in enumerate(scorelist, 1))
         else:
-            print("No entries yet.")
-            print("Start a new game and achieve the first highscore!")
+            lines.append("No entries yet.")
+            lines.append("Start a new game and achieve the first highscore!")
+        print(*lines, sep="\n")
 
     def reset_game(self):
         """Reset game attributes to start a new game."""
         self.current_level = 0
-        self.words = self.get_words()
-        self.scrambled_words = self.scramble()
+        self._wordbank = self._executor.submit(self.get_words)
+        self._scrambled_cache = {}
         self.level_times = []
         self.hint = True
 
     def play(self):
         """Show instructions and call game methods."""
-        # Check whether words are available.
-        if not self.words:
-            print(f"The word file {WORD_FILE} couldn't be read!")
-            print("Rename it or change the expected file name (WORD_FILE).")
-        else:
+        # Check whether the word file exists before anything is shown.
+        word_file_found = os.path.exists(WORD_FILE)
+        if word_file_found:
+            # Read words in the background.
+            self._load_words()
 
             # Show introduction and instructions.
             print("Welcome to SCRAMBLED WORDS.")
@@ -286,17 +415,29 @@ class ScrambledWords():
                 print("\nDo your best and try to enter the highscore list!")
                 time.sleep(4)
 
+        # Check whether words are available. They have been read in the
+        # background in the meantime.
+        if not (word_file_found and self.words):
+            print(f"The word file {WORD_FILE} couldn't be read!")
+            print("Rename it or change the expected file name (WORD_FILE).")
+        else:
+
             # Run game loop.
             while self.continue_game:
                 while self.current_level < self.total_levels:
                     self.next_level()
+                    if self.current_level == self.total_levels:
+                        # Read highscores in the background during the
+                        # last level, so that they are still up to date.
+                        self._highscores = self._executor.submit(
+                            self.get_highscores)
                     self.challenge()
 
                 # Show results.
                 level_points, level_bonus, score = self.get_results()
                 self.show_results(level_points, level_bonus, score)
 
-                scorelist = self.get_highscores()
+                scorelist = self._highscores.result()
                 # Add a new highscore.
                 if score:
                     if (len(scorelist) < 10) or (score >= scorelist[-1][0]):
@@ -314,6 +455,9 @@ class ScrambledWords():
                     print("Thanks for playing!")
                     self.continue_game = False
 
+        # Wait for background work, and stop the worker thread.
+        self._executor.shutdown()
+
 
 ######################################################################
 
@@ -1,23 +1,108 @@
 """Use these tests to make sure the class methods work as expected."""
 
+import marshal
+import os
+import shutil
+from pathlib import Path
+
 import pytest
-from scrambled_words import ScrambledWords
+import scrambled_words
+from scrambled_words import ScrambledWords, TIME_LIMIT, WORD_FILE
 
 @pytest.fixture
-def sw():
-    """Create an instance of ScrambledWords for all test functions."""
+def sw(monkeypatch, tmp_path):
+    """Create an instance of ScrambledWords for all test functions.
+
+    Run it in a temporary directory with a copy of the word file, so
+    that cache and highscore files aren't written to the working tree.
+    """
+    shutil.copy(Path(__file__).parent / WORD_FILE, tmp_path)
+    monkeypatch.chdir(tmp_path)
     sw = ScrambledWords()
-    return sw
+    yield sw
+    # Finish background work before the working directory is restored.
+    sw._executor.shutdown()
 
 def test_get_words(sw):
     """Are words read from the word file?"""
     assert sw.words
 
+def test_get_words_empty_file(sw, monkeypatch, tmp_path):
+    """Does an empty word file give an empty list of words?"""
+    word_file = tmp_path / "empty.txt"
+    word_file.write_text("")
+    monkeypatch.setattr(scrambled_words, "WORD_FILE", str(word_file))
+    assert sw.get_words() == []
+
+@pytest.fixture
+def word_file(tmp_path):
+    """Create a small word file, and return its path."""
+    word_file = tmp_path / "words.txt"
+    word_file.write_bytes(b"ice,man\r\nface\r\n")
+    return word_file
+
+def test_load_word_lists(word_file):
+    """Is a word file parsed, and is a cache file created for it?"""
+    word_lists = scrambled_words._load_word_lists(str(word_file))
+    assert word_lists == [["ICE", "MAN"], ["FACE"]]
+    assert word_file.with_suffix(".cache").exists()
+
+def test_load_word_lists_from_cache(word_file):
+    """Is the cache file used while the word file is unchanged?"""
+    scrambled_words._load_word_lists(str(word_file))
+    cache_file = word_file.with_suffix(".cache")
+    with open(cache_file, "rb") as cache:
+        cache_format, cache_stamp, _ = marshal.load(cache)
+    with open(cache_file, "wb") as cache:
+        marshal.dump((cache_format, cache_stamp, [["CACHED"]]), cache)
+    assert scrambled_words._load_word_lists(str(word_file)) == [["CACHED"]]
+
+@pytest.mark.parametrize("cache_content", [
+    b"broken",
+    marshal.dumps((2, [["OLD"]])),
+])
+def test_load_word_lists_bad_cache(word_file, cache_content):
+    """Are broken and old-format cache files replaced?"""
+    cache_file = word_file.with_suffix(".cache")
+    cache_file.write_bytes(cache_content)
+    word_lists = scrambled_words._load_word_lists(str(word_file))
+    assert word_lists == [["ICE", "MAN"], ["FACE"]]
+    with open(cache_file, "rb") as cache:
+        assert marshal.load(cache)[2] == word_lists
+
+def test_load_word_lists_changed_file(word_file):
+    """Is the cache rebuilt if the word file changes, even to an older time?"""
+    scrambled_words._load_word_lists(str(word_file))
+    word_file.write_bytes(b"sun,sky,day\r\n")
+    os.utime(word_file, (0, 0))
+    assert scrambled_words._load_word_lists(str(word_file)) == [
+        ["SUN", "SKY", "DAY"]]
+
+def test_load_word_lists_missing_file(tmp_path):
+    """Is None returned if the word file is missing?"""
+    missing_file = tmp_path / "missing.txt"
+    assert scrambled_words._load_word_lists(str(missing_file)) is None
+
+def test_play_missing_word_file(sw, monkeypatch, capsys):
+    """Is a missing word file reported before the instructions?"""
+    monkeypatch.setattr(scrambled_words, "WORD_FILE", "missing.txt")
+    sw.play()
+    output = capsys.readouterr().out
+    assert output.startswith("The word file missing.txt couldn't be read!")
+
 def test_scramble(sw):
     """Are all scrambled words different than the original ones?"""
     assert sw.scrambled_words
-    for scrambled_word in sw.scrambled_words:
-        assert scrambled_word not in sw.words
+    assert not set(sw.scrambled_words) & set(sw.words)
+    assert sw.scramble() == sw.scrambled_words
+
+def test_scramble_per_instance(sw):
+    """Does a new game leave the scrambled words of other games alone?"""
+    scrambled_words = sw.scrambled_words
+    other_game = ScrambledWords()
+    other_game.reset_game()
+    other_game._executor.shutdown()
+    assert sw.scrambled_words == scrambled_words
 
 def test_create_hint(sw):
     """Is the hint for a word created correctly?"""
@@ -25,6 +110,18 @@ def test_create_hint(sw):
     hint = sw.create_hint(word)
     assert word[:3] == hint[:3]
     assert word[3:] != hint[3:]
+    # Words without letters to shuffle must not fail.
+    assert sw.create_hint("") == ""
+
+def test_challenge_no_hint(sw, monkeypatch, capsys):
+    """Is the hint kept if it would show the solution?"""
+    monkeypatch.setattr(ScrambledWords, "words", ["FLUSS"])
+    answers = iter(["H", "FLUSS"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    sw.current_level = 1
+    sw.challenge()
+    assert sw.hint
+    assert "There is no hint for this word." in capsys.readouterr().out
 
 def test_reset_game(sw):
     """Are attributes reset when the user chooses to play again?"""
@@ -54,3 +151,33 @@ def test_reset_game(sw):
     sw.hint = False
     sw.reset_game()
     assert sw.hint
+
+def test_add_highscore(sw, monkeypatch):
+    """Is a new highscore inserted at its rank, keeping ten entries?"""
+    monkeypatch.setattr("builtins.input", lambda prompt: "Eve")
+    scorelist = [[points, "Bob"] for points in range(100, 0, -10)]
+    scorelist = sw.add_highscore(55, scorelist)
+    assert len(scorelist) == 10
+    assert [entry[0] for entry in scorelist] == [
+        100, 90, 80, 70, 60, 55, 50, 40, 30, 20]
+    assert scorelist[5][1] == "Eve"
+    assert sw.get_highscores() == scorelist
+
+def test_get_highscores_old_format(sw, tmp_path):
+    """Are highscore files with scores stored as strings still read?"""
+    (tmp_path / "highscores.json").write_text('[["90", "Bob"], ["40", "Eve"]]')
+    assert sw.get_highscores() == [[90, "Bob"], [40, "Eve"]]
+
+def test_get_results(sw):
+    """Are points, bonus points and the total score calculated correctly?"""
+    sw.level_times = [2.4, 0, 13.0]
+    level_points, level_bonus, score = sw.get_results()
+    assert level_points == [10, 0, 30]
+    assert level_bonus == [10, 0, 0]
+    assert score == 50
+
+def test_get_results_time_limit(sw):
+    """Is the bonus given for times that are shown within the limit?"""
+    sw.level_times = [TIME_LIMIT + 0.04, TIME_LIMIT + 0.06]
+    level_bonus = sw.get_results()[1]
+    assert level_bonus == [10, 0]